@@ -67,7 +67,9 @@ function handleRecorderStop() {
   reader.onloadend = () => {
     try {
       const result = reader.result || "";
-      const base64 = typeof result === "string" ? result.split(",")[1] : null;
+      // Slice past the data URL header instead of split() to avoid copying the payload twice.
+      const commaIndex = typeof result === "string" ? result.indexOf(",") : -1;
+      const base64 = commaIndex >= 0 ? result.slice(commaIndex + 1) : null;
       if (!base64) {
         throw new Error("Invalid audio data");
       }
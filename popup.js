@@ -694,6 +694,7 @@ function renderHistoryEntries(entries) {
       let createdAtValue = entry.createdAt;
       if (typeof createdAtValue === "string" && createdAtValue.endsWith("Z")) {
         // Legacy host versions stored local time but appended Z; strip to keep local interpretation.
+        // Current versions write a real "+00:00" offset, which Date parses as UTC.
         createdAtValue = createdAtValue.slice(0, -1);
       }
       const parsed = new Date(createdAtValue);
@@ -1,16 +1,40 @@
 import base64
+import io
 import json
 import os
+import shutil
+import sys
 import tempfile
 import unittest
 import uuid
+import wave
+from datetime import datetime, timezone
 from unittest import mock
 
+import av
 import numpy as np
 
 import whisper_host_utils as utils
 
 
+def _make_webm_tone(seconds, rate=48000):
+    """Encode a stereo sine tone as WebM/Opus, like the extension's MediaRecorder output."""
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=rate)
+        stream.layout = "stereo"
+        samples = (0.3 * np.sin(2 * np.pi * 440 * np.arange(int(seconds * rate)) / rate)).astype(np.float32)
+        for start in range(0, samples.size, 960):
+            block = samples[start:start + 960]
+            frame = av.AudioFrame.from_ndarray(np.vstack([block, block]), format="fltp", layout="stereo")
+            frame.sample_rate = rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
 class WhisperHostUtilsTest(unittest.TestCase):
     def setUp(self):
         self.fake_audio_bytes = b"fake-webm-bytes"
@@ -18,6 +42,29 @@ class WhisperHostUtilsTest(unittest.TestCase):
         self.fake_wav_array = np.array([0.1, 0.2], dtype=np.float32)
         self.mock_model = mock.Mock()
         self.mock_model.transcribe.return_value = {"text": " hello world "}
+        # The OS name is cached after the first lookup; clear it so tests can patch platform.system.
+        utils._SYSTEM = None
+
+    def test_convert_webm_to_wav_array_keeps_full_duration(self):
+        wav_array = utils.convert_webm_to_wav_array(_make_webm_tone(2))
+
+        self.assertEqual(wav_array.dtype, np.float32)
+        self.assertEqual(wav_array.shape, (2 * utils.PCM_SAMPLE_RATE,))
+
+    def test_convert_webm_to_wav_array_returns_independent_arrays(self):
+        first = utils.convert_webm_to_wav_array(_make_webm_tone(1))
+        snapshot = first.copy()
+        second = utils.convert_webm_to_wav_array(_make_webm_tone(2))
+
+        self.assertFalse(np.shares_memory(first, second))
+        np.testing.assert_array_equal(first, snapshot)
+
+    def test_convert_webm_to_wav_array_fills_given_buffer(self):
+        out = np.empty(3 * utils.PCM_SAMPLE_RATE, dtype=np.float32)
+        wav_array = utils.convert_webm_to_wav_array(_make_webm_tone(1), out=out)
+
+        self.assertTrue(np.shares_memory(wav_array, out))
+        self.assertEqual(wav_array.shape, (utils.PCM_SAMPLE_RATE,))
 
     def test_save_recording_bundle_writes_files(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -38,6 +85,34 @@ class WhisperHostUtilsTest(unittest.TestCase):
             with open(saved_paths["text"], "r", encoding="utf-8") as f:
                 self.assertEqual(f.read(), "hello world")
 
+    def test_save_recording_bundle_writes_wav_from_decoded_samples(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            saved_paths = utils.save_recording_bundle(
+                self.fake_audio_bytes,
+                "hello world",
+                output_dir=tmpdir,
+                wav_array=np.array([0.0, 0.5, -1.0, 2.0], dtype=np.float32),
+            )
+            self.assertEqual(os.path.basename(saved_paths["wav"]), "audio.wav")
+            self.assertTrue(os.path.exists(saved_paths["audio"]))
+            with wave.open(saved_paths["wav"], "rb") as wav_file:
+                self.assertEqual(wav_file.getnchannels(), 1)
+                self.assertEqual(wav_file.getframerate(), utils.PCM_SAMPLE_RATE)
+                frames = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
+            np.testing.assert_array_equal(frames, [0, 16383, -32767, 32767])
+
+    def test_save_recording_bundle_can_skip_webm(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            saved_paths = utils.save_recording_bundle(
+                self.fake_audio_bytes,
+                "hello world",
+                output_dir=tmpdir,
+                wav_array=np.zeros(4, dtype=np.float32),
+                keep_webm=False,
+            )
+            self.assertEqual(saved_paths["audio"], saved_paths["wav"])
+            self.assertFalse(os.path.exists(os.path.join(saved_paths["folder"], "audio.webm")))
+
     def test_save_recording_bundle_with_uuid_metadata(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             tab_uuid = "test-uuid-123"
@@ -66,7 +141,18 @@ class WhisperHostUtilsTest(unittest.TestCase):
             self.assertEqual(metadata["lastTitle"], "Metadata Tab")
             self.assertEqual(metadata["lastURL"], "https://example.com")
             self.assertEqual(metadata["lastRecordingFolder"], saved_paths["folder"])
-            self.assertIn("updatedAt", metadata)
+            self.assertTrue(metadata["updatedAt"].endswith("+00:00"))
+
+            with open(os.path.join(tab_folder, "history.jsonl"), "r", encoding="utf-8") as history_file:
+                history_entry = json.loads(history_file.readline())
+            self.assertEqual(history_entry["createdAt"], metadata["updatedAt"])
+
+    def test_save_recording_bundle_recreates_removed_tab_folder(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            utils.save_recording_bundle(self.fake_audio_bytes, "first", output_dir=tmpdir, tab_uuid="tab-1")
+            shutil.rmtree(os.path.join(tmpdir, "tab-1"))
+            saved_paths = utils.save_recording_bundle(self.fake_audio_bytes, "second", output_dir=tmpdir, tab_uuid="tab-1")
+            self.assertTrue(os.path.exists(saved_paths["text"]))
 
     def test_transcribe_audio_chunk_without_saving(self):
         with mock.patch.object(utils, "convert_webm_to_wav_array", return_value=self.fake_wav_array) as convert_mock:
@@ -77,6 +163,101 @@ class WhisperHostUtilsTest(unittest.TestCase):
         self.assertEqual(text, "hello world")
         self.assertIsNone(saved_path)
 
+    def test_transcribe_audio_chunk_accepts_raw_bytes(self):
+        with mock.patch.object(utils, "convert_webm_to_wav_array", return_value=self.fake_wav_array) as convert_mock:
+            text, saved_path = utils.transcribe_audio_chunk(self.fake_audio_bytes, self.mock_model)
+
+        convert_mock.assert_called_once_with(self.fake_audio_bytes, out=None)
+        self.assertEqual(text, "hello world")
+        self.assertIsNone(saved_path)
+
+    def test_transcribe_audio_chunk_joins_segment_results(self):
+        segments = [mock.Mock(text=" hello"), mock.Mock(text=" world ")]
+        self.mock_model.transcribe.return_value = (iter(segments), mock.Mock())
+        with mock.patch.object(utils, "convert_webm_to_wav_array", return_value=self.fake_wav_array):
+            text, _ = utils.transcribe_audio_chunk(self.fake_audio_b64, self.mock_model)
+
+        self.assertEqual(text, "hello world")
+
+    def test_transcribe_audio_chunk_strips_control_characters(self):
+        self.mock_model.transcribe.return_value = {"text": "\x00 hello\x1b world\x7f "}
+        with mock.patch.object(utils, "convert_webm_to_wav_array", return_value=self.fake_wav_array):
+            text, _ = utils.transcribe_audio_chunk(self.fake_audio_b64, self.mock_model)
+
+        self.assertEqual(text, "hello world")
+
+    def test_transcribe_audio_chunk_passes_transcribe_options(self):
+        with mock.patch.object(utils, "convert_webm_to_wav_array", return_value=self.fake_wav_array):
+            utils.transcribe_audio_chunk(
+                self.fake_audio_b64, self.mock_model, transcribe_options={"fp16": False}
+            )
+
+        self.mock_model.transcribe.assert_called_once_with(self.fake_wav_array, fp16=False)
+
+    def test_load_whisper_model_uses_int8_without_cuda(self):
+        fake_ctranslate2 = mock.Mock()
+        fake_ctranslate2.get_cuda_device_count.return_value = 0
+        fake_faster_whisper = mock.Mock()
+        with mock.patch.dict(
+            sys.modules, {"ctranslate2": fake_ctranslate2, "faster_whisper": fake_faster_whisper}
+        ):
+            utils.load_whisper_model("base")
+            fake_ctranslate2.get_cuda_device_count.return_value = 1
+            utils.load_whisper_model("base")
+
+        self.assertEqual(
+            fake_faster_whisper.WhisperModel.call_args_list,
+            [
+                mock.call("base", device="auto", compute_type="int8"),
+                mock.call("base", device="auto", compute_type="int8_float16"),
+            ],
+        )
+
+    def test_quantize_linear_layers_falls_back_to_float_model(self):
+        fake_torch = mock.Mock()
+        fake_torch.backends.quantized.engine = "none"
+        fake_torch.backends.quantized.supported_engines = ["qnnpack", "none"]
+        fake_torch.ao.quantization.quantize_dynamic.side_effect = RuntimeError("NoQEngine")
+        float_model = mock.Mock()
+        float_model.modules.return_value = []
+
+        with mock.patch.dict(sys.modules, {"torch": fake_torch}), self.assertLogs(level="WARNING"):
+            result = utils._quantize_linear_layers(float_model)
+
+        self.assertIs(result, float_model)
+        self.assertEqual(fake_torch.backends.quantized.engine, "qnnpack")
+
+    def test_quantize_linear_layers_without_engine_keeps_float_model(self):
+        fake_torch = mock.Mock()
+        fake_torch.backends.quantized.engine = "none"
+        fake_torch.backends.quantized.supported_engines = ["none"]
+        float_model = mock.Mock()
+
+        with mock.patch.dict(sys.modules, {"torch": fake_torch}), self.assertLogs(level="WARNING"):
+            result = utils._quantize_linear_layers(float_model)
+
+        self.assertIs(result, float_model)
+        fake_torch.ao.quantization.quantize_dynamic.assert_not_called()
+
+    def test_default_transcribe_options_uses_fp16_only_on_cuda(self):
+        self.mock_model.device.type = "cuda"
+        self.assertTrue(utils.default_transcribe_options(self.mock_model)["fp16"])
+        self.mock_model.device.type = "cpu"
+        options = utils.default_transcribe_options(self.mock_model)
+        self.assertFalse(options["fp16"])
+        self.assertFalse(options["condition_on_previous_text"])
+        self.assertNotIn("beam_size", options)
+
+    def test_default_transcribe_options_for_faster_whisper(self):
+        fake_model_cls = type("WhisperModel", (), {"__module__": "faster_whisper.transcribe"})
+        with mock.patch.dict(os.environ, {"WHISPER_HOST_LANGUAGE": "ja"}):
+            options = utils.default_transcribe_options(fake_model_cls())
+
+        self.assertEqual(options["beam_size"], 1)
+        self.assertTrue(options["vad_filter"])
+        self.assertEqual(options["language"], "ja")
+        self.assertNotIn("fp16", options)
+
     def test_transcribe_audio_chunk_with_saving(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             with mock.patch.object(utils, "convert_webm_to_wav_array", return_value=self.fake_wav_array):
@@ -101,13 +282,66 @@ class WhisperHostUtilsTest(unittest.TestCase):
             with open(saved_paths["text"], "r", encoding="utf-8") as f:
                 self.assertEqual(f.read(), "hello world")
 
+    def test_load_history_entries_missing_history(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertEqual(utils.load_history_entries(tab_uuid="no-such-tab", output_dir=tmpdir), [])
+
+    def test_load_history_entries_newest_first_with_transcripts(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = utils.save_recording_bundle(
+                self.fake_audio_bytes, "first", output_dir=tmpdir, tab_uuid="tab-1"
+            )
+            second = utils.save_recording_bundle(
+                self.fake_audio_bytes, "second", output_dir=tmpdir, tab_uuid="tab-1"
+            )
+            history_path = os.path.join(tmpdir, "tab-1", "history.jsonl")
+            with open(history_path, "r", encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            # Give the entries distinct timestamps regardless of how fast the saves ran.
+            records[0]["createdAt"] = "2024-01-01T00:00:00Z"
+            records[1]["createdAt"] = "2024-01-01T00:00:05Z"
+            with open(history_path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record) + "\n" for record in records))
+
+            entries = utils.load_history_entries(tab_uuid="tab-1", output_dir=tmpdir)
+
+        self.assertEqual([entry["folder"] for entry in entries], [second["folder"], first["folder"]])
+        self.assertEqual([entry["transcript"] for entry in entries], ["second", "first"])
+
+    def test_load_history_entries_with_limit_reads_newest_records(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            history_dir = os.path.join(tmpdir, "tab-1")
+            os.mkdir(history_dir)
+            with open(os.path.join(history_dir, "history.jsonl"), "w", encoding="utf-8") as f:
+                for second in range(5):
+                    f.write(json.dumps({"createdAt": f"2024-01-01T00:00:0{second}Z", "n": second}) + "\n")
+                f.write("not json\n\n")
+
+            entries = utils.load_history_entries(
+                tab_uuid="tab-1", output_dir=tmpdir, limit=2, include_transcripts=False
+            )
+
+        self.assertEqual([entry["n"] for entry in entries], [4, 3])
+
+    def test_parse_history_timestamp_reads_legacy_z_as_local_time(self):
+        legacy = utils._parse_history_timestamp("2024-01-01T12:00:00Z")
+        self.assertEqual(legacy, datetime(2024, 1, 1, 12, 0, 0).astimezone())
+        current = utils._parse_history_timestamp("2024-01-01T12:00:00+00:00")
+        self.assertEqual(current, datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc))
+        self.assertLess(utils._parse_history_timestamp(None), legacy)
+
+    def test_iter_lines_reversed_across_block_boundaries(self):
+        handle = io.BytesIO(b"first line\nsecond\n\nthird one here\nlast")
+        lines = list(utils._iter_lines_reversed(handle, block_size=4))
+        self.assertEqual(lines, [b"last", b"third one here", b"", b"second", b"first line"])
+
     def test_open_recordings_folder_mac(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             with mock.patch("whisper_host_utils.platform.system", return_value="Darwin"), \
                  mock.patch("whisper_host_utils.subprocess.Popen") as popen_mock:
                 folder = utils.open_recordings_folder(output_dir=tmpdir)
 
-        popen_mock.assert_called_once_with(["open", tmpdir])
+        popen_mock.assert_called_once_with(["open", tmpdir], **utils._OPENER_POPEN_KWARGS)
         self.assertEqual(folder, tmpdir)
 
     def test_open_recordings_folder_linux(self):
@@ -116,7 +350,7 @@ class WhisperHostUtilsTest(unittest.TestCase):
                  mock.patch("whisper_host_utils.subprocess.Popen") as popen_mock:
                 folder = utils.open_recordings_folder(output_dir=tmpdir)
 
-        popen_mock.assert_called_once_with(["xdg-open", tmpdir])
+        popen_mock.assert_called_once_with(["xdg-open", tmpdir], **utils._OPENER_POPEN_KWARGS)
         self.assertEqual(folder, tmpdir)
 
     def test_open_specific_folder_mac(self):
@@ -127,7 +361,7 @@ class WhisperHostUtilsTest(unittest.TestCase):
                  mock.patch("whisper_host_utils.subprocess.Popen") as popen_mock:
                 folder = utils.open_specific_folder(subdir)
 
-        popen_mock.assert_called_once_with(["open", subdir])
+        popen_mock.assert_called_once_with(["open", subdir], **utils._OPENER_POPEN_KWARGS)
         self.assertEqual(folder, subdir)
 
     def test_open_specific_folder_missing(self):
@@ -1,21 +1,34 @@
-import base64
+import io
 import json
 import logging
 import os
+import queue
 import struct
 import sys
+import threading
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-import whisper
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module.
+    orjson = None
 
 from whisper_host_utils import (
+    DEFAULT_MODEL_NAME,
+    PCM_SAMPLE_RATE,
+    base64_codec,
+    decode_audio_chunk,
+    default_transcribe_options,
+    get_model,
     open_recordings_folder,
     open_specific_folder,
     load_history_entries,
-    transcribe_audio_chunk,
+    transcribe_decoded_audio,
 )
 
 logger = logging.getLogger("whisper_host")
@@ -79,38 +92,64 @@ def setup_logging() -> None:
 setup_logging()
 logger.info("Starting Whisper host process")
 
-logger.info("Loading Whisper model 'base'")
-model = whisper.load_model("base")
-logger.info("Whisper model ready")
+# Frames are written from the main loop and the audio pipeline threads.
+send_lock = threading.Lock()
+# Bound once so each send skips the sys.stdout.buffer attribute chain.
+stdout_write = sys.stdout.buffer.write
+stdout_flush = sys.stdout.buffer.flush
 
 
-def send_message(message: Dict[str, Any]) -> None:
+def encode_frame(message: Dict[str, Any]) -> Optional[bytes]:
+    """Serialize a message into a length-prefixed native messaging frame."""
     try:
-        encoded = json.dumps(message).encode("utf-8")
+        if orjson is not None:
+            encoded = orjson.dumps(message)
+        else:
+            encoded = json.dumps(message).encode("utf-8")
     except (TypeError, ValueError):
         logger.exception("Failed to serialize message for sending")
+        return None
+    return struct.pack("<I", len(encoded)) + encoded
+
+
+def send_message(message: Dict[str, Any], flush: bool = True) -> None:
+    """
+    Write one frame to stdout. Pass flush=False when another send follows
+    immediately; the next flushing send delivers both frames.
+    """
+    frame = encode_frame(message)
+    if frame is None:
         return
 
-    sys.stdout.buffer.write(struct.pack("<I", len(encoded)))
-    sys.stdout.buffer.write(encoded)
-    sys.stdout.buffer.flush()
+    with send_lock:
+        stdout_write(frame)
+        if flush:
+            stdout_flush()
 
     msg_type = message.get("type") if isinstance(message, dict) else None
     logger.debug("Sent message type=%s", msg_type)
 
 
+# A 1 MiB read buffer lets one read() syscall pick up the length prefix and the
+# body of typical frames (and bursts of small control frames) together.
+stdin_stream = io.open(sys.stdin.fileno(), "rb", buffering=1 << 20, closefd=False)
+
+
 def read_message() -> Optional[Dict[str, Any]]:
-    raw_length = sys.stdin.buffer.read(4)
-    if not raw_length:
+    raw_length = stdin_stream.read(4)
+    if len(raw_length) < 4:
         logger.info("Input stream closed by browser")
         return None
 
     message_length = struct.unpack("<I", raw_length)[0]
-    message_bytes = sys.stdin.buffer.read(message_length)
+    message_bytes = stdin_stream.read(message_length)
 
     try:
-        payload = json.loads(message_bytes.decode("utf-8"))
-    except json.JSONDecodeError:
+        if orjson is not None:
+            payload = orjson.loads(message_bytes)
+        else:
+            payload = json.loads(message_bytes)
+    except (json.JSONDecodeError, UnicodeDecodeError):
         logger.exception("Unable to decode incoming message payload")
         send_message(
             {
@@ -129,8 +168,193 @@ def read_message() -> Optional[Dict[str, Any]]:
     return payload
 
 
+# Set once the model is loaded and "ModelReady" has been sent. The loader and
+# inference threads can both finish get_model(); the lock makes exactly one of
+# them send the announcement.
+model_ready = threading.Event()
+model_ready_lock = threading.Lock()
+
+
+def get_ready_model() -> Any:
+    """Return the shared model (loading it if needed) and announce it the first time."""
+    model = get_model()
+    if not model_ready.is_set():
+        with model_ready_lock:
+            if not model_ready.is_set():
+                logger.info("Whisper model ready")
+                send_message({"type": "status", "text": "ModelReady"})
+                model_ready.set()
+    return model
+
+
+def background_load_model() -> None:
+    logger.info(
+        "Loading Whisper model '%s' (backend=%s, compute_type=%s)",
+        os.getenv("WHISPER_HOST_MODEL") or DEFAULT_MODEL_NAME,
+        os.getenv("WHISPER_HOST_BACKEND") or "auto",
+        os.getenv("WHISPER_HOST_COMPUTE_TYPE") or "default",
+    )
+    try:
+        get_ready_model()
+    except Exception:
+        logger.exception("Background model load failed; retrying on first audio chunk")
+
+
+# The model loads while the main loop already serves folder/history commands.
+model_loader = threading.Thread(target=background_load_model, name="whisper-model-loader", daemon=True)
+
+
+# Audio messages flow through a two-stage pipeline so the next chunk is decoded
+# while Whisper is still busy with the previous one, and the main loop keeps
+# reading stdin (folder/history commands are not stuck behind transcription).
+decode_queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+inference_queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=1)
+
+
+def send_tab_history(msg: Dict[str, Any]) -> None:
+    """Answer a load-tab-history request."""
+    request_id = msg.get("requestId")
+    tab_uuid = msg.get("tabUUID")
+    output_dir = msg.get("outputDir", "recordings")
+    limit = msg.get("limit")
+    include_transcripts = msg.get("includeTranscripts", True)
+    try:
+        entries = load_history_entries(
+            tab_uuid=tab_uuid,
+            output_dir=output_dir,
+            limit=limit,
+            include_transcripts=include_transcripts,
+        )
+        send_message(
+            {
+                "type": "tab-history-result",
+                "requestId": request_id,
+                "tabUUID": tab_uuid,
+                "entries": entries,
+            }
+        )
+    except Exception as exc:
+        logger.exception("Unable to load tab history for %s", tab_uuid)
+        send_message(
+            {
+                "type": "tab-history-error",
+                "requestId": request_id,
+                "tabUUID": tab_uuid,
+                "text": f"Unable to load tab history: {exc}",
+            }
+        )
+
+
+def decode_worker() -> None:
+    # Three PCM buffers rotate: one being transcribed, one waiting in the
+    # inference queue, and one being decoded into.
+    buffers = [np.empty(PCM_SAMPLE_RATE * 60, dtype=np.float32) for _ in range(3)]
+    slot = 0
+    while True:
+        msg = decode_queue.get()
+        if msg is None:
+            inference_queue.put(None)
+            return
+        if msg.get("command") == "load-tab-history":
+            # History requests only need to stay in order with the saves.
+            inference_queue.put(msg)
+            continue
+        # Detach the base64 payload from the message so it is freed as soon as
+        # it is decoded, instead of riding along until the reply is sent.
+        audio_chunk = msg.pop("audioChunk")
+        try:
+            chunk_len = len(audio_chunk) if isinstance(audio_chunk, str) else 0
+            logger.info(
+                "Processing audio chunk (length=%s, save_to_disk=%s)",
+                chunk_len,
+                msg.get("saveToDisk", True),
+            )
+
+            logger.info(
+                "Transcription message data: tabTitle=%r tabUUID=%s tabId=%s tabURL=%s",
+                msg.get("tabTitle"),
+                msg.get("tabUUID"),
+                msg.get("tabId"),
+                msg.get("tabURL"),
+            )
+            audio_bytes, wav_array = decode_audio_chunk(audio_chunk, out=buffers[slot])
+        except Exception as exc:
+            logger.exception("Audio decoding failed")
+            # Report through the inference thread so the error is not sent
+            # ahead of results for chunks that are still queued.
+            inference_queue.put(exc)
+            continue
+        finally:
+            del audio_chunk
+
+        # Keep the buffer actually used, in case a long clip had to grow it.
+        buffers[slot] = wav_array.base
+        slot = (slot + 1) % len(buffers)
+        inference_queue.put((msg, audio_bytes, wav_array))
+
+
+# WHISPER_HOST_SAVE_WAV=1 also stores each recording as 16 kHz PCM16 audio.wav.
+save_wav = os.getenv("WHISPER_HOST_SAVE_WAV", "").lower() in ("1", "true", "yes")
+# WHISPER_HOST_KEEP_WEBM=0 then skips the original audio.webm.
+keep_webm = os.getenv("WHISPER_HOST_KEEP_WEBM", "1").lower() not in ("0", "false", "no")
+
+
+def inference_worker() -> None:
+    while True:
+        item = inference_queue.get()
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            send_message({"type": "error", "text": f"[Error] {item}"})
+            continue
+        if isinstance(item, dict):
+            send_tab_history(item)
+            continue
+        msg, audio_bytes, wav_array = item
+        try:
+            # Blocks until the background load finishes, or retries it if it failed.
+            model = get_ready_model()
+            text, saved_paths = transcribe_decoded_audio(
+                audio_bytes,
+                wav_array,
+                model,
+                save_to_disk=msg.get("saveToDisk", True),
+                tab_title=msg.get("tabTitle"),
+                tab_uuid=msg.get("tabUUID"),
+                tab_id=msg.get("tabId"),
+                tab_url=msg.get("tabURL"),
+                transcribe_options=default_transcribe_options(model),
+                save_wav=save_wav,
+                keep_webm=keep_webm,
+            )
+            display_text = text if len(text) <= 120 else f"{text[:117]}..."
+            logger.info("Transcription complete: %s", display_text)
+            if saved_paths:
+                logger.info("Saved recording bundle: %s", saved_paths)
+
+            result_payload = {"type": "result", "text": text}
+            if saved_paths:
+                folder = saved_paths.get("folder") or saved_paths.get("audio")
+                result_payload["savedPaths"] = saved_paths
+                send_message(
+                    {"type": "status", "text": f"Saved audio & transcript to {folder}"},
+                    flush=False,
+                )
+
+            send_message(result_payload)
+
+        except Exception as exc:
+            logger.exception("Transcription failed")
+            send_message({"type": "error", "text": f"[Error] {exc}"})
+
+
+decode_thread = threading.Thread(target=decode_worker, name="audio-decode", daemon=True)
+inference_thread = threading.Thread(target=inference_worker, name="whisper-inference", daemon=True)
+decode_thread.start()
+inference_thread.start()
+
 send_message({"type": "status", "text": "Whisper host started"})
-send_message({"type": "status", "text": "ModelReady"})
+model_loader.start()
 
 while True:
     msg = read_message()
@@ -169,36 +393,9 @@ while True:
         continue
 
     if command == "load-tab-history":
-        request_id = msg.get("requestId")
-        tab_uuid = msg.get("tabUUID")
-        output_dir = msg.get("outputDir", "recordings")
-        limit = msg.get("limit")
-        include_transcripts = msg.get("includeTranscripts", True)
-        try:
-            entries = load_history_entries(
-                tab_uuid=tab_uuid,
-                output_dir=output_dir,
-                limit=limit,
-                include_transcripts=include_transcripts,
-            )
-            send_message(
-                {
-                    "type": "tab-history-result",
-                    "requestId": request_id,
-                    "tabUUID": tab_uuid,
-                    "entries": entries,
-                }
-            )
-        except Exception as exc:
-            logger.exception("Unable to load tab history for %s", tab_uuid)
-            send_message(
-                {
-                    "type": "tab-history-error",
-                    "requestId": request_id,
-                    "tabUUID": tab_uuid,
-                    "text": f"Unable to load tab history: {exc}",
-                }
-            )
+        # Queued behind pending audio chunks so the reply includes recordings
+        # whose bundles the inference thread has not saved yet.
+        decode_queue.put(msg)
         continue
 
     if command == "load-audio-file":
@@ -209,13 +406,14 @@ while True:
                 raise ValueError("Missing audio file path.")
             with open(audio_path, "rb") as audio_file:
                 audio_bytes = audio_file.read()
-            encoded_audio = base64.b64encode(audio_bytes).decode("ascii")
+            encoded_audio = base64_codec.b64encode(audio_bytes).decode("ascii")
             send_message(
                 {
                     "type": "audio-file",
                     "requestId": request_id,
                     "path": audio_path,
-                    "mimeType": msg.get("mimeType", "audio/webm"),
+                    "mimeType": msg.get("mimeType")
+                    or ("audio/wav" if audio_path.endswith(".wav") else "audio/webm"),
                     "base64": encoded_audio,
                 }
             )
@@ -236,46 +434,13 @@ while True:
         continue
 
     if "audioChunk" in msg:
-        try:
-            audio_chunk = msg["audioChunk"]
-            chunk_len = len(audio_chunk) if isinstance(audio_chunk, str) else 0
-            logger.info(
-                "Processing audio chunk (length=%s, save_to_disk=%s)",
-                chunk_len,
-                msg.get("saveToDisk", True),
-            )
-
-            # logger info log the msg data
-            logger.info("Transcription message data: %s", {k: v for k, v in msg.items() if k != "audioChunk"})
-            text, saved_paths = transcribe_audio_chunk(
-                audio_chunk,
-                model,
-                save_to_disk=msg.get("saveToDisk", True),
-                tab_title=msg.get("tabTitle"),
-                tab_uuid=msg.get("tabUUID"),
-                tab_id=msg.get("tabId"),
-                tab_url=msg.get("tabURL"),
-            )
-            display_text = text if len(text) <= 120 else f"{text[:117]}..."
-            logger.info("Transcription complete: %s", display_text)
-            if saved_paths:
-                logger.info("Saved recording bundle: %s", saved_paths)
-
-            result_payload = {"type": "result", "text": text}
-            if saved_paths:
-                folder = saved_paths.get("folder") or saved_paths.get("audio")
-                result_payload["savedPaths"] = saved_paths
-                send_message(
-                    {"type": "status", "text": f"Saved audio & transcript to {folder}"}
-                )
-
-            send_message(result_payload)
-
-        except Exception as exc:
-            logger.exception("Transcription failed")
-            send_message({"type": "error", "text": f"[Error] {exc}"})
+        decode_queue.put(msg)
         continue
 
     logger.debug("Unhandled message keys=%s", list(msg.keys()))
 
+# Let chunks that are already queued finish before exiting.
+decode_queue.put(None)
+inference_thread.join()
+
 logger.info("Whisper host shutting down")
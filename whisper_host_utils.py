@@ -1,48 +1,283 @@
 import base64
 import io
+import itertools
 import json
 import logging
 import os
 import platform
 import re
+import secrets
 import subprocess
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-import uuid
+import wave
 
 import numpy as np
 import av
 
+try:
+    import pybase64 as base64_codec
+except ImportError:  # pybase64 is optional; the stdlib module exposes the same API.
+    base64_codec = base64
 
-def convert_webm_to_wav_array(audio_bytes):
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module.
+    orjson = None
+
+
+def _dump_json_line(record):
+    """Serialize one history record as a UTF-8 JSON line (bytes)."""
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _load_json(data):
+    """Parse JSON from bytes; raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+PCM_SAMPLE_RATE = 16000
+
+
+def convert_webm_to_wav_array(audio_bytes, out=None):
     """
     Convert WebM (Opus) audio bytes to a 16 kHz mono float32 numpy array.
     This function is pure and easy to unit test by supplying synthetic audio.
+    Decoding runs in-process through libavformat/libavcodec, so no decoder
+    process is spawned per chunk.
+
+    Pass a preallocated float32 ``out`` array to reuse it across calls; the
+    result is then a view into it, valid until ``out`` is reused. Without
+    ``out`` (or if the clip does not fit) a new array is allocated.
     """
-    container = av.open(io.BytesIO(audio_bytes), format="webm")
-    stream = container.streams.get(audio=0)[0]
+    buffer = np.empty(PCM_SAMPLE_RATE * 60, dtype=np.float32) if out is None else out
 
+    # Packed float32 mono is already Whisper's input layout, so each resampled
+    # frame is copied straight into the output buffer. The resampler is built
+    # per call: flushing it ends its filter graph, so it cannot be reused.
     resampler = av.audio.resampler.AudioResampler(
-        format="fltp",
+        format="flt",
         layout="mono",
-        rate=16000,
+        rate=PCM_SAMPLE_RATE,
     )
 
-    frames = []
-    for packet in container.demux(stream):
-        for frame in packet.decode():
-            frames.extend(resampler.resample(frame))
-
-    if not frames:
+    filled = 0
+    with av.open(io.BytesIO(audio_bytes), format="webm") as container:
+        stream = container.streams.get(audio=0)[0]
+        # Let libavcodec pick frame/slice threading where the decoder supports it.
+        stream.codec_context.thread_type = "AUTO"
+        # The trailing None flushes the resampler so its buffered tail samples
+        # are not dropped.
+        for frame in itertools.chain(container.decode(stream), [None]):
+            for resampled in resampler.resample(frame):
+                # View the frame's sample plane directly instead of copying it
+                # through to_ndarray(); packed mono has one float per sample.
+                block = np.frombuffer(resampled.planes[0], dtype=np.float32, count=resampled.samples)
+                end = filled + block.size
+                if end > buffer.size:
+                    grown = np.empty(max(end, buffer.size * 2), dtype=np.float32)
+                    grown[:filled] = buffer[:filled]
+                    buffer = grown
+                buffer[filled:end] = block
+                filled = end
+
+    if not filled:
         raise ValueError("Decoding audio frames failed.")
 
-    np_frames = [frame.to_ndarray() for frame in frames]
-    audio_data = np.concatenate(np_frames, axis=1)
-    return audio_data[0].astype(np.float32)
+    if out is None:
+        # The array is private to this call, so trim it in place rather than
+        # keeping the unused tail alive behind a view.
+        buffer.resize(filled, refcheck=False)
+        return buffer
+    return buffer[:filled]
+
+
+DEFAULT_MODEL_NAME = "base"
+
+
+def load_whisper_model(model_name=DEFAULT_MODEL_NAME, backend=None, compute_type=None):
+    """
+    Load a Whisper model for transcription.
+
+    backend selects the implementation: "faster-whisper" (CTranslate2, runs on
+    CUDA when available with int8 weights), "openai-whisper" (reference PyTorch),
+    or None/"auto" to prefer faster-whisper when it is installed.
+
+    compute_type is passed to faster-whisper (default: "int8_float16" when a
+    CUDA device is present, otherwise "int8", since CTranslate2 rejects
+    int8_float16 on CPU). For the PyTorch backend an "int8*" value loads the
+    model on CPU and dynamically quantizes its Linear layers to int8; this is
+    the default when CUDA is not available ("float32" keeps full precision).
+    """
+    backend = (backend or "auto").strip().lower()
+    if backend not in ("auto", "faster-whisper", "openai-whisper"):
+        raise ValueError(f"Unknown Whisper backend: {backend}")
+
+    if backend in ("auto", "faster-whisper"):
+        try:
+            import ctranslate2
+            from faster_whisper import WhisperModel
+        except ImportError:
+            if backend == "faster-whisper":
+                raise
+        else:
+            if compute_type is None:
+                has_cuda = ctranslate2.get_cuda_device_count() > 0
+                compute_type = "int8_float16" if has_cuda else "int8"
+            return WhisperModel(
+                model_name,
+                device="auto",
+                compute_type=compute_type,
+            )
+
+    import torch
+    import whisper
+
+    _configure_torch_threads(torch)
+    if compute_type is None and not torch.cuda.is_available():
+        compute_type = "int8"
+    if compute_type and compute_type.lower().startswith("int8"):
+        return _quantize_linear_layers(whisper.load_model(model_name, device="cpu"))
+    return whisper.load_model(model_name)
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def get_model():
+    """
+    Return the process-wide Whisper model, loading it on first use.
+    Concurrent callers block until the first load finishes; a failed load is
+    retried by the next caller.
+
+    Environment variables:
+      WHISPER_HOST_MODEL: model name (default: base).
+      WHISPER_HOST_BACKEND: faster-whisper, openai-whisper or auto (default).
+      WHISPER_HOST_COMPUTE_TYPE: weight precision passed to the backend.
+    """
+    global _MODEL
+    with _MODEL_LOCK:
+        if _MODEL is None:
+            _MODEL = load_whisper_model(
+                os.getenv("WHISPER_HOST_MODEL") or DEFAULT_MODEL_NAME,
+                backend=os.getenv("WHISPER_HOST_BACKEND"),
+                compute_type=os.getenv("WHISPER_HOST_COMPUTE_TYPE"),
+            )
+        return _MODEL
+
+
+def _configure_torch_threads(torch):
+    """
+    Size intra-op parallelism to roughly the physical cores (half the logical
+    CPUs on SMT machines) and keep a single inter-op thread: the host runs one
+    transcription at a time next to the audio decode thread, so more threads
+    only oversubscribe the CPU.
+    """
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed once per process, before any inter-op work has started.
+        logging.debug("torch inter-op thread count already fixed; leaving it unchanged")
+
+
+# Quantized backends in order of preference; torch builds ship a subset.
+_QUANTIZED_ENGINES = ("x86", "fbgemm", "qnnpack", "onednn")
+
+
+def _quantize_linear_layers(model):
+    """
+    Dynamically quantize a PyTorch Whisper model's Linear layers to int8 (CPU only).
+    If this torch build has no usable quantized engine (e.g. "NoQEngine" on
+    some Apple Silicon builds), the float32 model is returned unchanged.
+    """
+    import torch
+
+    quantized = torch.backends.quantized
+    if quantized.engine == "none":
+        supported = quantized.supported_engines
+        engine = next((name for name in _QUANTIZED_ENGINES if name in supported), None)
+        if engine is None:
+            logging.warning("No quantized engine in this torch build; keeping the float32 model")
+            return model
+        quantized.engine = engine
+
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            # whisper subclasses Linear only to cast weights for fp16 inference;
+            # quantize_dynamic matches exact module types, so expose the base class.
+            module.__class__ = torch.nn.Linear
+    try:
+        quantized_model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    except RuntimeError as exc:
+        logging.warning("int8 quantization failed (%s); keeping the float32 model", exc)
+        return model
+    quantized_model.eval()
+    return quantized_model
+
+
+def default_transcribe_options(model):
+    """
+    Return keyword arguments for model.transcribe() suited to the loaded model.
+
+    Both backends decode each recording on its own: conditioning on previous
+    text only grows the decoder context across 30 s windows, timestamps are
+    never shown, and a single temperature skips the fallback re-decodes.
+    WHISPER_HOST_LANGUAGE (e.g. "ja") skips language detection.
+
+    faster-whisper defaults to a 5-wide beam search; greedy decoding plus its
+    Silero VAD filter (which skips silent stretches of tab audio) is much cheaper.
+
+    openai-whisper defaults to fp16 and warns on every CPU call before falling
+    back to fp32, so half precision is requested only when the model is on CUDA.
+    Its decoder is already greedy at temperature 0 (beam_size=1 would switch to
+    the slower beam search path). The numpy input is already shared with torch
+    via torch.from_numpy inside whisper, so no tensor conversion is done here.
+    """
+    options = {
+        "condition_on_previous_text": False,
+        "temperature": 0.0,
+        "without_timestamps": True,
+        "language": os.getenv("WHISPER_HOST_LANGUAGE") or None,
+    }
+    if type(model).__module__.startswith("faster_whisper"):
+        options.update(beam_size=1, vad_filter=True)
+        return options
+    device = getattr(model, "device", None)
+    options["fp16"] = getattr(device, "type", None) == "cuda"
+    return options
+
+
+# Deletes ASCII control characters (keeping tab and newline) in one C-level pass.
+_CONTROL_CHARS_TABLE = str.maketrans(
+    "", "", "".join(chr(code) for code in range(32) if chr(code) not in "\t\n") + "\x7f"
+)
+
+
+def _transcription_text(result):
+    """
+    Extract the transcript from either backend's transcribe() result:
+    openai-whisper returns a dict, faster-whisper a (segments, info) tuple.
+    """
+    if isinstance(result, dict):
+        return result.get("text", "")
+    segments, _info = result
+    return "".join(segment.text for segment in segments)
 
 
 MAX_PREFIX_CHARS = 60
 
+_UNSAFE_PREFIX_CHARS_RE = re.compile(r'[^\w\s-]')
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+
 
 def _build_folder_prefix(tab_title):
     """
@@ -72,10 +307,10 @@ def _build_folder_prefix(tab_title):
 
     # Replace any character that is NOT alphanumeric, space, hyphen, or underscore with an empty string.
     # This is much stricter than the original regex and prevents common path traversal techniques.
-    cleaned_title = re.sub(r'[^\w\s-]', '', cleaned_title)
+    cleaned_title = _UNSAFE_PREFIX_CHARS_RE.sub('', cleaned_title)
 
     # Replace multiple spaces with a single space and trim whitespace again
-    cleaned_title = re.sub(r'\s+', ' ', cleaned_title).strip()
+    cleaned_title = _WHITESPACE_RUN_RE.sub(' ', cleaned_title).strip()
 
     # Ensure no leading/trailing dots or hyphens that might be problematic in some systems
     # For example, "..." or "---" might be interpreted strangely or just look bad.
@@ -96,29 +331,49 @@ def save_recording_bundle(
     tab_uuid=None,
     tab_id=None,
     tab_url=None,
+    wav_array=None,
+    keep_webm=True,
 ):
-    """Persist audio and transcript into a timestamped folder and return the paths."""
+    """
+    Persist audio and transcript into a timestamped folder and return the paths.
+    When the already decoded ``wav_array`` is given it is also written as a
+    16 kHz PCM16 ``audio.wav`` next to the original WebM; with ``keep_webm``
+    False the WebM is skipped and ``audio`` points at the WAV instead.
+    """
     output_dir_path = Path(output_dir)
-    output_dir_path.mkdir(parents=True, exist_ok=True)
-
     if tab_uuid:
         tab_root = output_dir_path / tab_uuid
     else:
         tab_root = output_dir_path
-    tab_root.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    token = uuid.uuid4().hex[:6]
+    # One clock read per save keeps the folder name, tab.json and history in
+    # step. Folder names stay in local time; stored timestamps are UTC with an
+    # explicit "+00:00" offset, because older entries used a "Z" suffix on
+    # local time (see _parse_history_timestamp).
+    now = datetime.now(timezone.utc)
+    created_at = now.isoformat(timespec="seconds")
+    timestamp = now.astimezone().strftime("%Y%m%d-%H%M%S")
+    token = secrets.token_hex(3)
     prefix = _build_folder_prefix(tab_title)
     folder_path = tab_root / f"{prefix}-{timestamp}-{token}"
-    folder_path.mkdir(parents=True, exist_ok=True)
+    # New per recording (timestamp plus random token); parents=True also
+    # creates the tab and output directories, so no separate mkdir is needed.
+    folder_path.mkdir(parents=True)
 
     audio_path = folder_path / "audio.webm"
     text_path = folder_path / "transcript.txt"
     history_path = (tab_root if tab_uuid else output_dir_path) / "history.jsonl"
 
-    with audio_path.open("wb") as f:
-        f.write(audio_bytes)
+    wav_path = None
+    if wav_array is not None:
+        wav_path = folder_path / "audio.wav"
+        write_pcm16_wav(wav_path, wav_array)
+        if not keep_webm:
+            audio_path = wav_path
+
+    if audio_path != wav_path:
+        with audio_path.open("wb") as f:
+            f.write(audio_bytes)
 
     with text_path.open("w", encoding="utf-8") as f:
         f.write(transcript_text)
@@ -130,7 +385,7 @@ def save_recording_bundle(
             "lastTabId": tab_id,
             "lastTitle": tab_title,
             "lastURL": tab_url,
-            "updatedAt": datetime.now().isoformat(timespec="seconds") + "Z",
+            "updatedAt": created_at,
             "lastRecordingFolder": str(folder_path),
         }
         metadata_path = tab_root / "tab.json"
@@ -138,7 +393,7 @@ def save_recording_bundle(
             json.dump(metadata, f, ensure_ascii=False, indent=2)
 
     history_entry = {
-        "createdAt": datetime.now().isoformat(timespec="seconds") + "Z",
+        "createdAt": created_at,
         "folder": str(folder_path),
         "audio": str(audio_path),
         "text": str(text_path),
@@ -147,10 +402,11 @@ def save_recording_bundle(
         "tabTitle": tab_title,
         "tabURL": tab_url,
     }
+    if wav_path:
+        history_entry["wav"] = str(wav_path)
     try:
-        with history_path.open("a", encoding="utf-8") as f:
-            json.dump(history_entry, f, ensure_ascii=False)
-            f.write("\n")
+        with history_path.open("ab") as f:
+            f.write(_dump_json_line(history_entry))
     except OSError as exc:
         logging.warning("Failed to append history entry to %s: %s", history_path, exc)
 
@@ -159,6 +415,8 @@ def save_recording_bundle(
         "audio": str(audio_path),
         "text": str(text_path),
     }
+    if wav_path:
+        result["wav"] = str(wav_path)
     if tab_uuid:
         result["tabFolder"] = str(tab_root)
         if metadata_path:
@@ -166,6 +424,17 @@ def save_recording_bundle(
     return result
 
 
+def write_pcm16_wav(path, wav_array, sample_rate=PCM_SAMPLE_RATE):
+    """Write float32 samples in [-1, 1] as a mono 16-bit PCM WAV file."""
+    pcm = np.clip(wav_array, -1.0, 1.0)
+    pcm = (pcm * 32767.0).astype("<i2")
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+
+
 def ensure_recordings_root(output_dir="recordings"):
     """
     Ensure the recordings root directory exists and return it as a Path.
@@ -186,6 +455,28 @@ def open_recordings_folder(output_dir="recordings"):
         raise RuntimeError(f"Unable to open recordings folder: {exc}") from exc
 
 
+_SYSTEM = None
+
+# Detach file-manager helpers: stdout is the native-messaging channel, so any
+# output from the child would corrupt it, and the helper should not share our
+# session or inherited descriptors.
+_OPENER_POPEN_KWARGS = {
+    "stdin": subprocess.DEVNULL,
+    "stdout": subprocess.DEVNULL,
+    "stderr": subprocess.DEVNULL,
+    "close_fds": True,
+    "start_new_session": True,
+}
+
+
+def _get_system():
+    """Return platform.system(), resolved once per process (reset _SYSTEM to re-query)."""
+    global _SYSTEM
+    if _SYSTEM is None:
+        _SYSTEM = platform.system()
+    return _SYSTEM
+
+
 def open_specific_folder(folder_path):
     """
     Open a specific folder path in the user's file explorer. Returns the folder path.
@@ -200,15 +491,15 @@ def open_specific_folder(folder_path):
         raise FileNotFoundError(f"Folder does not exist: {folder}")
 
     folder_str = str(folder)
-    system = platform.system()
+    system = _get_system()
 
     try:
         if system == "Windows":
             os.startfile(folder_str)  # type: ignore[attr-defined]
         elif system == "Darwin":
-            subprocess.Popen(["open", folder_str])
+            subprocess.Popen(["open", folder_str], **_OPENER_POPEN_KWARGS)
         else:
-            subprocess.Popen(["xdg-open", folder_str])
+            subprocess.Popen(["xdg-open", folder_str], **_OPENER_POPEN_KWARGS)
     except Exception as exc:
         raise RuntimeError(f"Unable to open folder: {exc}") from exc
 
@@ -222,13 +513,54 @@ def _resolve_history_path(tab_uuid=None, output_dir="recordings"):
     return base / "history.jsonl"
 
 
+_OLDEST_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc)
+
+
 def _parse_history_timestamp(value):
+    """
+    Parse a createdAt value into an aware datetime for sorting. Legacy entries
+    hold local time with a "Z" suffix, so they are read as local time; newer
+    entries carry a real UTC offset.
+    """
     if not value:
-        return datetime.min
+        return _OLDEST_TIMESTAMP
     try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        parsed = datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
     except ValueError:
-        return datetime.min
+        return _OLDEST_TIMESTAMP
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed
+
+
+def _iter_lines_reversed(handle, block_size=64 * 1024):
+    """Yield the lines of a binary file from last to first, reading blocks from the end."""
+    handle.seek(0, os.SEEK_END)
+    position = handle.tell()
+    remainder = b""
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        handle.seek(position)
+        lines = (handle.read(read_size) + remainder).split(b"\n")
+        # The first piece may be the tail of a line that starts in an earlier block.
+        remainder = lines[0]
+        yield from reversed(lines[1:])
+    yield remainder
+
+
+def _read_transcript(text_path_str):
+    """Return the stripped transcript stored at a history entry's text path, or None."""
+    if not text_path_str:
+        return None
+    text_path = Path(text_path_str)
+    if not text_path.is_absolute():
+        text_path = (Path.cwd() / text_path).resolve()
+    try:
+        return text_path.read_text(encoding="utf-8").strip()
+    except OSError as exc:
+        logging.warning("Unable to read transcript for history entry %s: %s", text_path, exc)
+        return None
 
 
 def load_history_entries(tab_uuid=None, output_dir="recordings", limit=None, include_transcripts=True):
@@ -236,24 +568,30 @@ def load_history_entries(tab_uuid=None, output_dir="recordings", limit=None, inc
     Load history records for the given tab UUID from history.jsonl.
 
     Returns a list sorted by createdAt desc. Each entry includes transcript text if requested.
+    Entries are appended in chronological order, so with a limit the file is
+    read backwards and parsing stops after the newest ``limit`` records.
     """
     history_path = _resolve_history_path(tab_uuid, output_dir=output_dir)
-    if not history_path.exists():
-        return []
+    limited = isinstance(limit, int) and limit > 0
 
     entries = []
     try:
-        with history_path.open("r", encoding="utf-8") as handle:
-            for line in handle:
+        with history_path.open("rb") as handle:
+            lines = _iter_lines_reversed(handle) if limited else handle
+            for line in lines:
                 stripped = line.strip()
                 if not stripped:
                     continue
                 try:
-                    record = json.loads(stripped)
-                except json.JSONDecodeError:
+                    record = _load_json(stripped)
+                except ValueError:
                     logging.warning("Skipping malformed history line in %s", history_path)
                     continue
                 entries.append(record)
+                if limited and len(entries) >= limit:
+                    break
+    except FileNotFoundError:
+        return []
     except OSError as exc:
         logging.error("Failed to read history file %s: %s", history_path, exc)
         return []
@@ -263,7 +601,7 @@ def load_history_entries(tab_uuid=None, output_dir="recordings", limit=None, inc
         reverse=True,
     )
 
-    if isinstance(limit, int) and limit > 0:
+    if limited:
         entries = entries[:limit]
 
     if not include_transcripts:
@@ -271,26 +609,35 @@ def load_history_entries(tab_uuid=None, output_dir="recordings", limit=None, inc
 
     enriched = []
     for entry in entries:
+        transcript_text = _read_transcript(entry.get("text"))
         enriched_entry = dict(entry)
-        text_path_str = entry.get("text")
-        transcript_text = None
-        if text_path_str:
-            text_path = Path(text_path_str)
-            if not text_path.is_absolute():
-                text_path = (Path.cwd() / text_path).resolve()
-            try:
-                with text_path.open("r", encoding="utf-8") as transcript_handle:
-                    transcript_text = transcript_handle.read().strip()
-            except OSError as exc:
-                logging.warning("Unable to read transcript for history entry %s: %s", text_path, exc)
         if transcript_text is not None:
             enriched_entry["transcript"] = transcript_text
         enriched.append(enriched_entry)
     return enriched
 
 
-def transcribe_audio_chunk(
-    audio_chunk_b64,
+def decode_audio_chunk(audio_chunk_b64, out=None):
+    """
+    Decode a base64-encoded WebM chunk and convert it to a wav array.
+    Returns a tuple of (audio_bytes, wav_array); ``out`` is forwarded to
+    convert_webm_to_wav_array.
+
+    Raw WebM bytes (bytes, bytearray or memoryview) are used as-is, so callers
+    that already hold binary audio skip the base64 round-trip.
+    """
+    if isinstance(audio_chunk_b64, (bytes, bytearray, memoryview)):
+        audio_bytes = audio_chunk_b64
+    else:
+        audio_bytes = base64_codec.b64decode(audio_chunk_b64, validate=False)
+
+    wav_array = convert_webm_to_wav_array(audio_bytes, out=out)
+    return (audio_bytes, wav_array)
+
+
+def transcribe_decoded_audio(
+    audio_bytes,
+    wav_array,
     model,
     save_to_disk=False,
     output_dir="recordings",
@@ -298,16 +645,19 @@ def transcribe_audio_chunk(
     tab_uuid=None,
     tab_id=None,
     tab_url=None,
+    transcribe_options=None,
+    save_wav=False,
+    keep_webm=True,
 ):
     """
-    Decode a base64-encoded WebM chunk, optionally save it, convert to wav array,
-    and run Whisper. Returns a tuple of (transcript, saved_path).
+    Run Whisper on an already decoded wav array and optionally save the
+    original audio bytes. Returns a tuple of (transcript, saved_path).
+    transcribe_options are extra keyword arguments for model.transcribe();
+    save_wav also stores the decoded samples as audio.wav, reusing this decode,
+    and keep_webm=False then drops the original WebM.
     """
-    audio_bytes = base64.b64decode(audio_chunk_b64)
-
-    wav_array = convert_webm_to_wav_array(audio_bytes)
-    result = model.transcribe(wav_array)
-    text = result.get("text", "").strip()
+    result = model.transcribe(wav_array, **(transcribe_options or {}))
+    text = _transcription_text(result).translate(_CONTROL_CHARS_TABLE).strip()
     final_text = text or "[Empty]"
 
     saved_paths = None
@@ -320,6 +670,39 @@ def transcribe_audio_chunk(
             tab_uuid=tab_uuid,
             tab_id=tab_id,
             tab_url=tab_url,
+            wav_array=wav_array if save_wav else None,
+            keep_webm=keep_webm,
         )
 
     return (final_text, saved_paths)
+
+
+def transcribe_audio_chunk(
+    audio_chunk_b64,
+    model=None,
+    save_to_disk=False,
+    output_dir="recordings",
+    tab_title=None,
+    tab_uuid=None,
+    tab_id=None,
+    tab_url=None,
+    transcribe_options=None,
+):
+    """
+    Decode a base64-encoded WebM chunk, optionally save it, convert to wav array,
+    and run Whisper. Returns a tuple of (transcript, saved_path).
+    Without an explicit model the shared get_model() instance is used.
+    """
+    audio_bytes, wav_array = decode_audio_chunk(audio_chunk_b64)
+    return transcribe_decoded_audio(
+        audio_bytes,
+        wav_array,
+        model if model is not None else get_model(),
+        save_to_disk=save_to_disk,
+        output_dir=output_dir,
+        tab_title=tab_title,
+        tab_uuid=tab_uuid,
+        tab_id=tab_id,
+        tab_url=tab_url,
+        transcribe_options=transcribe_options,
+    )